@@ -1,8 +1,18 @@
 import os
+import sys
+import shutil
 from datetime import datetime
 from openpyxl import Workbook, load_workbook
 from inv_tools import date_converter, comma_check
-from openpyxl.styles import Font, Border, Side, Alignment, PatternFill
+from openpyxl.utils import get_column_letter
+from openpyxl.styles import (
+    Font,
+    Border,
+    Side,
+    Alignment,
+    PatternFill,
+    NamedStyle,
+)
 
 
 excel_file = "invoices.xlsx"
@@ -59,70 +69,143 @@ def get_inputs():
     ]
 
 
-def format_spreadsheet(ws):
+HEADER_STYLE = "invoice_header"
+CELL_STYLE = "invoice_cell"
+AMOUNT_STYLE = "invoice_amount"
 
-    # Freezes header
-    ws.freeze_panes = "A2"
+# Column "Amount ($)" (8th column)
+AMOUNT_COLUMN = 8
 
-    # Bold text in header
-    bold_font = Font(bold=True)
 
-    # Grey background to header
-    header_background = PatternFill(
-        start_color="DDDDDD", end_color="DDDDDD", fill_type="solid"
-    )
+def register_styles(wb):
+    """
+    Add the shared named styles to the workbook, so every cell points to
+    one of three styles instead of carrying its own font/border/alignment.
+    """
+    if HEADER_STYLE in wb.named_styles:
+        return
+
+    # Borders
+    side = Side(border_style="thin", color="000000")
+    border = Border(left=side, right=side, top=side, bottom=side)
 
     # Lignt text centrally
     align_centrally = Alignment(horizontal="center", vertical="center")
 
-    # Borders
-    border = Border(
-        left=Side(border_style="thin", color="000000"),
-        right=Side(border_style="thin", color="000000"),
-        top=Side(border_style="thin", color="000000"),
-        bottom=Side(border_style="thin", color="000000"),
+    # Bold text and grey background to header
+    header = NamedStyle(name=HEADER_STYLE)
+    header.font = Font(bold=True)
+    header.fill = PatternFill(
+        start_color="DDDDDD", end_color="DDDDDD", fill_type="solid"
     )
+    header.border = border
+    header.alignment = align_centrally
 
-    # Column width
-    for col in ws.columns:
-        max_length = 0
-        column = col[0].column_letter
-        for cell in col:
-            if cell.value:
-                max_length = max(max_length, len(str(cell.value)))
-        ws.column_dimensions[column].width = max_length + 2
+    cell = NamedStyle(name=CELL_STYLE)
+    cell.border = border
+    cell.alignment = align_centrally
+
+    # Amount as currency
+    amount = NamedStyle(name=AMOUNT_STYLE)
+    amount.border = border
+    amount.alignment = align_centrally
+    amount.number_format = "$ #,##0.00"
+
+    for style in (header, cell, amount):
+        wb.add_named_style(style)
+
+
+def format_spreadsheet(ws, min_row=1):
+    """
+    Apply the invoice layout to the sheet. Rows before min_row are taken as
+    already formatted, so registering one invoice only styles its own row.
+    """
+    register_styles(ws.parent)
 
-    # Apply format styless to fylld places
-    for row in ws.iter_rows(
-        min_row=1, max_row=ws.max_row, min_col=1, max_col=ws.max_column
-    ):
+    # Freezes header
+    ws.freeze_panes = "A2"
+
+    # Longest value per column; an incremental call starts from the width
+    # already stored for the column
+    max_lengths = {}
+    for col in range(1, ws.max_column + 1):
+        dimension = ws.column_dimensions[get_column_letter(col)]
+        if min_row > 1 and dimension.customWidth:
+            max_lengths[col] = dimension.width - 2
+        else:
+            max_lengths[col] = 0
+
+    # Apply format styles to filled places
+    for row in ws.iter_rows(min_row=min_row, max_row=ws.max_row):
         for cell in row:
-            if cell.value is not None:
-                cell.alignment = align_centrally
-                cell.border = border
+            if cell.value is None:
+                continue
+            if cell.value:
+                max_lengths[cell.column] = max(
+                    max_lengths[cell.column], len(str(cell.value))
+                )
+
+            # Formats set by hand in Excel (dates, percentages) are kept
+            number_format = cell.number_format
 
-                if cell.row == 1:
-                    cell.font = bold_font
-                    cell.fill = header_background
+            if cell.row == 1:
+                cell.style = HEADER_STYLE
+            # Whole amounts are read back from the file as int
+            elif cell.column == AMOUNT_COLUMN and isinstance(
+                cell.value, (int, float)
+            ):
+                cell.style = AMOUNT_STYLE
+            else:
+                cell.style = CELL_STYLE
 
-    # Format column "Amount ($)" como moeda (4ª column)
-    col_valor_index = 8
-    for row in ws.iter_rows(min_row=2, max_row=ws.max_row):
-        cell = row[col_valor_index - 1]
-        if isinstance(cell.value, float):
-            cell.number_format = "$ #,##0.00"
+            if number_format != "General":
+                cell.number_format = number_format
+
+    # Column width
+    for col, max_length in max_lengths.items():
+        ws.column_dimensions[get_column_letter(col)].width = max_length + 2
 
     # Higher height to header
     ws.row_dimensions[1].height = 25
 
 
+def compact_workbook(file_path=excel_file):
+    """
+    Migrate an existing invoices file in place to the shared named styles.
+    The invoice sheet is restyled inside the loaded workbook, so other
+    sheets and custom number formats (dates edited in Excel) are kept, and
+    a .bak copy of the original is written first.
+    """
+    if not os.path.exists(file_path):
+        print("⚠️ Invoices file not found.")
+        return
+
+    old_size = os.path.getsize(file_path)
+    backup = f"{file_path}.bak"
+    shutil.copy2(file_path, backup)
+
+    wb = load_workbook(file_path)
+    format_spreadsheet(wb.active)
+    wb.save(file_path)
+    print(
+        f"✅ Workbook compacted: {old_size / 1024:.0f} KB -> "
+        + f"{os.path.getsize(file_path) / 1024:.0f} KB "
+        + f"(original kept at {backup})"
+    )
+
+
 def run():
 
     while True:
         wb, ws = file_create()
         dados = get_inputs()
         ws.append(dados)
-        format_spreadsheet(ws)
+        # A new file, or one written before the named styles, gets the
+        # whole layout; otherwise only the new row is styled
+        if ws["A1"].style != HEADER_STYLE:
+            format_spreadsheet(ws)
+        else:
+            format_spreadsheet(ws, min_row=ws.max_row)
         wb.save(excel_file)
         print("✅ Input registering successfull!")
 
@@ -144,4 +227,7 @@ def run():
 
 
 if __name__ == "__main__":
-    run()
+    if "--compact" in sys.argv[1:]:
+        compact_workbook()
+    else:
+        run()
@@ -1,6 +1,10 @@
 from rep_tools import (
     load_data,
     show_menu,
+    build_patient_index,
+    suggest_patients,
+    name_key,
+    build_payer_index,
     MONTHS,
     monthly_general_report,
     yearly_general_report,
@@ -8,10 +12,38 @@ from rep_tools import (
     patient_yearly_report,
     totals_per_patient_report,
     custom_period_report,
+    payer_monthly_report,
+    payer_yearly_report,
 )
 from datetime import datetime
 
 
+def resolve_patient(index, patient):
+    """
+    Check the typed patient name against the index and, when it is not an
+    exact match, offer the closest known names to pick from.
+    :return: the name to use in the report
+    """
+    suggestions = suggest_patients(index, patient)
+
+    # Exact match once case and spacing are ignored, as in the reports
+    if suggestions and name_key(suggestions[0][0]) == name_key(patient):
+        return suggestions[0][0]
+
+    if not suggestions:
+        print(f"⚠️ No patient similar to '{patient}' found.")
+        return patient
+
+    print(f"🔎 '{patient}' not found. Did you mean:")
+    for i, (name, score) in enumerate(suggestions, start=1):
+        print(f"{i}. {name} ({score:.0%} match)")
+    choice = input("Choose a number (Enter keeps the typed name): ").strip()
+
+    if choice.isdigit() and 1 <= int(choice) <= len(suggestions):
+        return suggestions[int(choice) - 1][0]
+    return patient
+
+
 def main():
     data = load_data()
 
@@ -19,6 +51,9 @@ def main():
         print("❌ No data loaded. Check the Excel file.")
         return
 
+    patient_index = build_patient_index(data)
+    payer_index = build_payer_index(data)
+
     while True:
         show_menu()
         option = input("\nChoose an option: ")
@@ -35,7 +70,7 @@ def main():
 
         elif option == "2":
             # Patient report (monthly or yearly)
-            patient = input("Patient name: ")
+            patient = resolve_patient(patient_index, input("Patient name: "))
             choice = input("Do you want a [1] Monthly or [2] Yearly report? ")
 
             if choice == "1":
@@ -67,12 +102,29 @@ def main():
             ).lower()
 
             if filter_patient == "y":
-                patient = input("Patient name: ")
+                patient = resolve_patient(
+                    patient_index, input("Patient name: ")
+                )
                 custom_period_report(data, start_date, end_date, patient)
             else:
                 custom_period_report(data, start_date, end_date)
 
         elif option == "6":
+            # Household report: payer and all their dependents
+            payer_ssn = input("Payer SSN: ")
+            choice = input("Do you want a [1] Monthly or [2] Yearly report? ")
+
+            if choice == "1":
+                month = int(input("Month (1-12): "))
+                year = int(input("Year: "))
+                payer_monthly_report(payer_index, payer_ssn, month, year)
+            elif choice == "2":
+                year = int(input("Year: "))
+                payer_yearly_report(payer_index, payer_ssn, year)
+            else:
+                print("⚠️ Invalid option.")
+
+        elif option == "7":
             print("Closing the program.")
             break
 
@@ -1,4 +1,5 @@
 import os
+import math
 from datetime import datetime
 from openpyxl import load_workbook
 from collections import Counter, defaultdict
@@ -15,6 +16,10 @@ Available reports:
 - General yearly
 - Totals per patient
 - Custom date range
+- Per payer/household (monthly and yearly)
+
+Patient names are indexed by character trigrams so typos in the patient
+name can be answered with ranked suggestions.
 
 Developed by Matheus.
 """
@@ -44,7 +49,8 @@ def show_menu():
     print("3. General yearly report")
     print("4. Totals per patient in the year")
     print("5. Custom report by date range")
-    print("6. Exit")
+    print("6. Household/payer report (monthly/yearly)")
+    print("7. Exit")
 
 
 def load_data(file_path="invoices.xlsx"):
@@ -52,7 +58,8 @@ def load_data(file_path="invoices.xlsx"):
         print("⚠️ Invoices file not found.")
         return []
 
-    wb = load_workbook(file_path)
+    # Read-only mode streams the rows instead of building every cell
+    wb = load_workbook(file_path, read_only=True)
     ws = wb.active
 
     data = []
@@ -77,9 +84,378 @@ def load_data(file_path="invoices.xlsx"):
             print(f"Error loading row: {row}\n{e}")
             continue
 
+    wb.close()
     return data
 
 
+def name_key(name) -> str:
+    """
+    Normalize a patient name for comparisons: case and repeated spaces are
+    ignored, so "John  Smith" and "john smith" are the same patient.
+    """
+    return " ".join(str(name).lower().split())
+
+
+def name_ngrams(name: str, n: int = 3) -> set:
+    """
+    Split a name into its set of character n-grams.
+    :param name: name to split (compared case-insensitively)
+    :param n: size of each gram
+    :return: set of n-grams, padded so word starts and ends also count
+    """
+    padded = f"  {name_key(name)} "
+    return {padded[i : i + n] for i in range(len(padded) - n + 1)}
+
+
+def ids_to_mask(ids, size: int) -> int:
+    """
+    Pack a list of name ids into an int bitmask, bit i set for id i.
+    """
+    bits = bytearray(size // 8 + 1)
+    for i in ids:
+        bits[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(bits, "little")
+
+
+def mask_to_ids(mask: int) -> List[int]:
+    """
+    Unpack an int bitmask back into the list of ids whose bit is set.
+    """
+    bits = bin(mask)[:1:-1]  # lowest bit first
+    ids = []
+    i = bits.find("1")
+    while i != -1:
+        ids.append(i)
+        i = bits.find("1", i + 1)
+    return ids
+
+
+def build_patient_index(data):
+    """
+    Build a trigram index over the distinct patient names in the data.
+    Meant to be built once right after load_data.
+    :param data: list of invoices returned by load_data
+    :return: dict with the known names, their gram sets, the
+    gram -> name ids postings and bitmasks of the frequent grams and of
+    each gram-set size
+    """
+    names = []
+    known = {}
+    name_grams = []
+    grams = defaultdict(list)
+    sizes = defaultdict(list)
+
+    for invoice in data:
+        name = invoice.get("patient/dependent")
+        if not name:
+            continue
+        key = name_key(name)
+        if key in known:
+            continue
+
+        name_id = len(names)
+        known[key] = name_id
+        names.append(str(name))
+        name_grams.append(name_ngrams(key))
+        sizes[len(name_grams[name_id])].append(name_id)
+        for gram in name_grams[name_id]:
+            grams[gram].append(name_id)
+
+    # Grams shared by many names (" jo", "son") are kept as bitmasks, so a
+    # lookup combines them with a few int operations instead of walking
+    # thousands of ids
+    total = len(names)
+    gram_masks = {
+        gram: ids_to_mask(ids, total)
+        for gram, ids in grams.items()
+        if len(ids) > total // 128
+    }
+    size_masks = {
+        size: ids_to_mask(ids, total) for size, ids in sizes.items()
+    }
+
+    return {
+        "names": names,
+        "known": known,
+        "name_grams": name_grams,
+        "grams": grams,
+        "gram_masks": gram_masks,
+        "size_masks": size_masks,
+    }
+
+
+def at_least(counts, threshold: int, everyone: int) -> int:
+    """
+    Bitmask of the names whose count is >= threshold, where counts[b]
+    holds bit b of every name's count.
+    """
+    if threshold >> len(counts):
+        return 0
+
+    greater, equal = 0, everyone
+    for b in reversed(range(len(counts))):
+        if threshold >> b & 1:
+            equal &= counts[b]
+        else:
+            greater |= equal & counts[b]
+    return greater | equal
+
+
+def suggest_patients(index, query, limit=5, min_score=0.5):
+    """
+    Return the patient names closest to the query, best match first.
+    The shared-gram count of every name is added up on bitmasks, and only
+    the names that can still reach min_score are scored.
+    :param index: dict returned by build_patient_index
+    :param query: patient name as typed by the user
+    :param limit: maximum number of suggestions
+    :param min_score: lowest similarity (0 to 1) worth suggesting
+    :return: list of (name, score) tuples
+    """
+    key = name_key(query)
+    if key in index["known"]:
+        return [(index["names"][index["known"][key]], 1.0)]
+
+    query_grams = name_ngrams(key)
+    total = len(index["names"])
+    if not query_grams or not total:
+        return []
+
+    # Bit-sliced counter: counts[b] is bit b of each name's number of
+    # grams shared with the query
+    counts = []
+    for gram in query_grams:
+        carry = index["gram_masks"].get(gram)
+        if carry is None:
+            carry = ids_to_mask(index["grams"].get(gram, ()), total)
+        for b in range(len(counts)):
+            counts[b], carry = counts[b] ^ carry, counts[b] & carry
+            if not carry:
+                break
+        if carry:
+            counts.append(carry)
+
+    # Try strict scores first: once `limit` names reach a score, no name
+    # below it can make the top of the list, so they are never scored
+    q = len(query_grams)
+    everyone = (1 << total) - 1
+    levels = [x / 10 for x in range(9, 0, -1) if x / 10 > min_score]
+    scored = []
+    for level in levels + [min_score]:
+        candidates = score_candidates(index, counts, q, level, everyone)
+        scored = []
+        for name_id in mask_to_ids(candidates):
+            grams = index["name_grams"][name_id]
+            score = 2 * len(query_grams & grams) / (q + len(grams))
+            if score >= level:
+                scored.append((score, index["names"][name_id]))
+        if len(scored) >= limit:
+            break
+
+    scored.sort(key=lambda x: (-x[0], x[1]))
+    return [(name, score) for score, name in scored[:limit]]
+
+
+def score_candidates(index, counts, q: int, score: float, everyone: int):
+    """
+    Bitmask of the names that share enough grams with a query of q grams
+    to possibly reach the given score. The Dice coefficient
+    2 * shared / (|q| + |c|) >= score sets, for each name size |c|, the
+    minimum number of shared grams.
+    """
+    by_threshold = defaultdict(int)
+    for size, mask in index["size_masks"].items():
+        threshold = math.ceil(score * (q + size) / 2 - 1e-9)
+        if threshold <= min(q, size):
+            by_threshold[max(1, threshold)] |= mask
+
+    candidates = 0
+    for threshold, mask in by_threshold.items():
+        candidates |= mask & at_least(counts, threshold, everyone)
+    return candidates
+
+
+def ssn_key(ssn) -> str:
+    """
+    Normalize an SSN read from the spreadsheet (text or number) so the same
+    person always maps to the same key. Separators and spaces are dropped,
+    so "123-45-6789" and "123456789" are one person and the key is safe to
+    use in file names.
+    """
+    if ssn is None:
+        return ""
+    if isinstance(ssn, float) and ssn.is_integer():
+        ssn = int(ssn)
+    return "".join(ch for ch in str(ssn) if ch.isalnum())
+
+
+def dependent_key(invoice):
+    """
+    Key of the dependent an invoice belongs to: their SSN, or their
+    normalized name when the Dependent SSN was left blank.
+    """
+    dependent_ssn = ssn_key(invoice.get("dependent_SSN"))
+    if dependent_ssn:
+        return ("SSN", dependent_ssn)
+    return ("name", name_key(invoice.get("patient/dependent") or "Unknown"))
+
+
+def build_payer_index(data):
+    """
+    Join payers to their dependents and invoices in a single pass over the
+    data, keyed by payer SSN.
+    :param data: list of invoices returned by load_data
+    :return: dict payer SSN -> {"name", "dependents", "invoices"}, where
+    dependents maps dependent key -> (patient name, dependent SSN) and
+    invoices is a list of (dependent key, invoice) pairs
+    """
+    payers = {}
+
+    for invoice in data:
+        payer_ssn = ssn_key(invoice.get("payer_SSN"))
+        if not payer_ssn:
+            continue
+
+        payer = payers.setdefault(
+            payer_ssn,
+            {
+                "name": invoice.get("who_paid"),
+                "dependents": {},
+                "invoices": [],
+            },
+        )
+        key = dependent_key(invoice)
+        payer["dependents"].setdefault(
+            key,
+            (
+                invoice.get("patient/dependent") or "Unknown",
+                key[1] if key[0] == "SSN" else "N/A",
+            ),
+        )
+        payer["invoices"].append((key, invoice))
+
+    return payers
+
+
+def payer_monthly_report(payer_index, payer_ssn, month, year):
+    payer_ssn = ssn_key(payer_ssn)
+    payer = payer_index.get(payer_ssn)
+    if not payer:
+        print(f"⚠️ No payer with SSN {payer_ssn} found.")
+        return
+
+    total_value = 0
+    total_invoices = 0
+    totals_per_dependent = defaultdict(float)
+    transactions = []
+    lines = []
+
+    for key, invoice in payer["invoices"]:
+        payment_date = datetime.strptime(invoice["payment_date"], "%d/%m/%Y")
+        if payment_date.month == month and payment_date.year == year:
+            value = invoice.get("amount", 0.0)
+            totals_per_dependent[key] += value
+            total_value += value
+            total_invoices += 1
+            transactions.append(
+                {
+                    "Invoice Number": invoice.get("invoice_number", "N/A"),
+                    "Payment Date": invoice.get("payment_date", "N/A"),
+                    "Patient/Dependent": invoice.get(
+                        "patient/dependent", "Unknown"
+                    ),
+                    "Dependent SSN": payer["dependents"][key][1],
+                    "Amount": value,
+                    "Payment Method": invoice.get("payment_method", "N/A"),
+                }
+            )
+
+    if total_invoices == 0:
+        print(
+            f"📆 No payments from payer {payer_ssn} recorded in "
+            + f"{month:02d}/{year}."
+        )
+        return
+
+    lines.append(
+        f"===== 🏠 HOUSEHOLD REPORT: {str(payer['name']).upper()} "
+        + f"(SSN {payer_ssn}) - {month:02d}/{year} ====="
+    )
+    lines.append(f"Total invoices: {total_invoices}")
+    lines.append(f"Total paid in the month: $ {total_value:.2f}")
+    lines.append("\nTotals per dependent:")
+    for key, total in sorted(
+        totals_per_dependent.items(), key=lambda x: x[1], reverse=True
+    ):
+        name, dependent_ssn = payer["dependents"][key]
+        lines.append(f"- {name} (SSN {dependent_ssn}): $ {total:.2f}")
+    lines.append("")
+
+    for i, t in enumerate(transactions, start=1):
+        lines.append(f"--- Invoice {i} ---")
+        for key, value in t.items():
+            if key == "Amount":
+                lines.append(f"{key}: $ {value:.2f}")
+            else:
+                lines.append(f"{key}: {value}")
+        lines.append("")
+
+    file_name = f"household_report_{payer_ssn}_{month:02d}_{year}.txt"
+    save_and_print(file_name, lines)
+
+    return total_value, total_invoices, dict(totals_per_dependent)
+
+
+def payer_yearly_report(payer_index, payer_ssn, year):
+    payer_ssn = ssn_key(payer_ssn)
+    payer = payer_index.get(payer_ssn)
+    if not payer:
+        print(f"⚠️ No payer with SSN {payer_ssn} found.")
+        return
+
+    total_value = 0
+    total_invoices = 0
+    totals_per_dependent = defaultdict(float)
+    values_per_month = defaultdict(float)
+    lines = []
+
+    for key, invoice in payer["invoices"]:
+        payment_date = datetime.strptime(invoice["payment_date"], "%d/%m/%Y")
+        if payment_date.year == year:
+            value = invoice.get("amount", 0.0)
+            totals_per_dependent[key] += value
+            values_per_month[payment_date.month] += value
+            total_value += value
+            total_invoices += 1
+
+    if total_invoices == 0:
+        print(f"📅 No payments from payer {payer_ssn} recorded in {year}.")
+        return
+
+    lines.append(
+        f"===== 🏠 YEARLY HOUSEHOLD REPORT: {str(payer['name']).upper()} "
+        + f"(SSN {payer_ssn}) - {year} ====="
+    )
+    lines.append(f"Total invoices in the year: {total_invoices}")
+    lines.append(f"Total amount paid in the year: $ {total_value:.2f}")
+    lines.append(f"Dependents attended: {len(totals_per_dependent)}")
+    lines.append("\nTotals per dependent:")
+    for key, total in sorted(
+        totals_per_dependent.items(), key=lambda x: x[1], reverse=True
+    ):
+        name, dependent_ssn = payer["dependents"][key]
+        lines.append(f"- {name} (SSN {dependent_ssn}): $ {total:.2f}")
+
+    lines.append("\nValues per month:")
+    for month in range(1, 13):
+        lines.append(f"- {MONTHS[month]}: $ {values_per_month[month]:.2f}")
+
+    file_name = f"yearly_household_report_{payer_ssn}_{year}.txt"
+    save_and_print(file_name, lines)
+
+    return total_value, total_invoices, dict(totals_per_dependent)
+
+
 def save_and_print(file_name: str, lines: List[str]) -> None:
     """
     Save the lines into the specified file and print them on console.
@@ -213,8 +589,8 @@ def patient_monthly_report(data, patient, month, year):
         payment_date = datetime.strptime(invoice["payment_date"], "%d/%m/%Y")
 
         if payment_date.month == month and payment_date.year == year:
-            if invoice.get("patient/dependent", "").lower() == (
-                patient.lower()
+            if name_key(invoice.get("patient/dependent", "")) == (
+                name_key(patient)
             ):
                 n = {
                     "Invoice Number": invoice.get("invoice_number", "N/A"),
@@ -223,8 +599,8 @@ def patient_monthly_report(data, patient, month, year):
                     "Patient/Dependent": invoice.get(
                         "patient/dependent", "Unknown"
                     ),
-                    "Payer CPF": invoice.get("payer_CPF", "N/A"),
-                    "Dependent CPF": invoice.get("dependent_CPF", "N/A"),
+                    "Payer SSN": invoice.get("payer_SSN", "N/A"),
+                    "Dependent SSN": invoice.get("dependent_SSN", "N/A"),
                     "Amount": invoice.get("amount", 0.0),
                     "Who Paid": invoice.get("who_paid", "N/A"),
                     "Payment Method": invoice.get("payment_method", "N/A"),
@@ -279,7 +655,8 @@ def patient_yearly_report(data, patient, year):
         # Filter by year and patient (safe comparison)
         if (
             payment_date.year == year
-            and invoice.get("patient/dependent", "").lower() == patient.lower()
+            and name_key(invoice.get("patient/dependent", ""))
+            == name_key(patient)
         ):
             n = {
                 "Invoice Number": invoice.get("invoice_number", "N/A"),
@@ -288,8 +665,8 @@ def patient_yearly_report(data, patient, year):
                 "Patient/Dependent": invoice.get(
                     "patient/dependent", "Unknown"
                 ),
-                "Payer CPF": invoice.get("payer_CPF", "N/A"),
-                "Dependent CPF": invoice.get("dependent_CPF", "N/A"),
+                "Payer SSN": invoice.get("payer_SSN", "N/A"),
+                "Dependent SSN": invoice.get("dependent_SSN", "N/A"),
                 "Amount": invoice.get("amount", 0.0),
                 "Who Paid": invoice.get("who_paid", "N/A"),
                 "Payment Method": invoice.get("payment_method", "N/A"),
@@ -388,7 +765,7 @@ def custom_period_report(data, start_date, end_date, patient=None):
 
         if start_date <= payment_date <= end_date:
             patient_name = invoice.get("patient/dependent", "Unknown")
-            if patient and patient_name.lower() != patient.lower():
+            if patient and name_key(patient_name) != name_key(patient):
                 continue  # ignore if filtering by patient and doesn’t match
 
             value = invoice.get("amount", 0.0)